@@ -1,27 +1,180 @@
+import base64
+import functools
+import hashlib
+import json
+import math
 import os
+import random
 import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+import numpy as np
+import openpyxl
 import pandas as pd
+from pandas.io.parsers import TextParser
 import requests
-from datetime import datetime
-from typing import Dict, List
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
-# Load environment variables from .env file if it exists
+# Maximum number of in-flight POSTs to ServiceNow
+MAX_CONCURRENT_REQUESTS = 16
+
+# Records per ServiceNow Batch API call
+BATCH_SIZE = 100
+
+# POSTs rejected with these statuses were never processed, so they are safe
+# to re-send after backing off (honouring Retry-After when present)
+RETRYABLE_POST_STATUSES = frozenset({429, 503})
+POST_MAX_RETRIES = 5
+POST_BACKOFF_BASE = 0.5
+POST_BACKOFF_CAP = 30
+
+# Created records are only checked for their status, so ask ServiceNow to
+# echo back just the sys_id instead of the whole new row
+CREATE_QUERY = 'sysparm_fields=sys_id'
+
+# Batch API responses meaning the endpoint is missing or not permitted for
+# this user - batching is switched off for the rest of the run
+BATCH_UNAVAILABLE_STATUSES = frozenset({401, 403, 404})
+
+# Page size when fetching existing records for the duplicate check
+EXISTING_PAGE_SIZE = 1000
+
+# Existing-record indexes and synced-sheet digests are kept here between
+# runs and fully refreshed daily
+CACHE_DIR = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'servicenow_sync'
+)
+CACHE_TTL = 24 * 60 * 60
+
+# Layout of ServiceNow's sys_updated_on values
+SYS_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Workbooks at least this large are parsed one sheet per process
+PARALLEL_PARSE_MIN_BYTES = 5 * 1024 * 1024
+MAX_PARSE_WORKERS = 8
+
+# Workbook columns the sync reads - anything else (Hour, spacer columns)
+# is dropped at parse time. Cell types are left to the reader on purpose:
+# forcing dtypes would change how values are stringified for ServiceNow.
+SHEET_COLUMNS = frozenset({'Date', 'Timestamp', 'Location', 'Value', 'Status'})
+
+# Text normalize_value treats as empty
+NULL_TEXT = frozenset({'nan', 'nat', 'none', 'null'})
+
+# Layout of the sheets' Timestamp cells
+TIMESTAMP_FORMAT = '%H:%M:%S'
+
+# Sheets pushed in full to iot_alert_event (matched upper-cased)
+ALERT_SHEET_NAMES = frozenset({'ALERTS'})
+
+# Excel column → iot_alert_event field
+ALERT_FIELD_MAP = {
+    'Date': 'alert_date',
+    'Timestamp': 'alert_time',
+    'Location': 'location',
+    'Value': 'severity',
+    'Status': 'message',
+}
+
+# Excel column → iot_sensor_record field ('Value' is split into
+# numeric_value / text_value in transform_sensor_data)
+SENSOR_FIELD_MAP = {
+    'Date': 'record_date',
+    'Timestamp': 'record_time',
+    'Location': 'location',
+    'Status': 'status',
+}
+
+# Fields that make up the duplicate-check key, in key order
+ALERT_KEY_FIELDS = ('alert_date', 'alert_time', 'location', 'severity', 'message', 'sensor_type_id')
+SENSOR_KEY_FIELDS = (
+    'record_date', 'record_time', 'location', 'sensor_type_id',
+    'status', 'numeric_value', 'text_value', 'is_active'
+)
+
+# Fast JSON encoding/decoding for request and response bodies
 try:
-    from dotenv import load_dotenv
-    load_dotenv()
-    print("✓ Loaded environment variables from .env file")
+    import orjson
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads
 except ImportError:
-    print("⚠ python-dotenv not installed. Using system environment variables only.")
-    print("  Install with: pip install python-dotenv")
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+    json_loads = json.loads
 
-# Load environment variables from .env file if it exists
+# Prefer the Rust calamine reader for the workbook (pandas >= 2.2)
 try:
-    from dotenv import load_dotenv
-    load_dotenv()
-    print("✓ Loaded environment variables from .env file")
+    from python_calamine import CalamineWorkbook
+    CALAMINE_AVAILABLE = True
 except ImportError:
-    print("⚠ python-dotenv not installed. Using system environment variables only.")
-    print("  Install with: pip install python-dotenv")
+    CALAMINE_AVAILABLE = False
+
+class CappedRetry(Retry):
+    """urllib3 Retry that honours Retry-After for GETs, but never waits longer than POST_BACKOFF_CAP"""
+    
+    def get_retry_after(self, response) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(POST_BACKOFF_CAP, retry_after)
+
+def load_sheet(file_path: str, sheet_name: str) -> pd.DataFrame:
+    """Parse a single sheet (top-level so it can run in a worker process)"""
+    return pd.read_excel(file_path, sheet_name=sheet_name, engine='calamine', usecols=SHEET_COLUMNS.__contains__)
+
+def float_text(value_str: str) -> Optional[str]:
+    """str(float(value_str)), or None when it isn't a number"""
+    try:
+        return str(float(value_str))
+    except ValueError:
+        return None
+
+@functools.lru_cache(maxsize=16384)
+def normalize_text(value_str: str) -> str:
+    """
+    Normalization behind ServiceNowSync.normalize_value
+    
+    Memoized: dates, locations, sensor ids and is_active repeat on almost
+    every record, so each distinct value is only parsed once per run.
+    """
+    value_str = value_str.strip()
+    
+    # Normalize common variations
+    if value_str.lower() in NULL_TEXT:
+        return ''
+    
+    # For time values, normalize to remove microseconds and timezone info
+    # e.g., "20:57:45.000" -> "20:57:45"
+    if ':' in value_str:
+        if len(value_str) > 5:
+            # Remove microseconds if present
+            value_str = value_str.partition('.')[0]
+            # Remove timezone info if present
+            if '+' in value_str:
+                value_str = value_str.partition('+')[0].strip()
+            if value_str.endswith('Z'):
+                value_str = value_str[:-1].strip()
+        # Anything with a ':' left in it is not a number
+        if ':' in value_str:
+            return value_str
+    
+    # Normalize numeric values to consistent format
+    try:
+        num = float(value_str)
+    except ValueError:
+        return value_str
+    
+    # Remove trailing zeros and decimal point if integer
+    if num.is_integer():
+        return str(int(num))
+    if math.isfinite(num):
+        return str(num)
+    # nan/inf spellings are kept as written
+    return value_str
 
 class ServiceNowSync:
     def __init__(self):
@@ -42,27 +195,62 @@ class ServiceNowSync:
             "Accept": "application/json"
         }
         
+        # Shared session so every call reuses pooled keep-alive connections
+        # instead of paying a new TCP + TLS handshake per request
+        self.session = requests.Session()
+        self.session.auth = (self.username, self.password)
+        self.session.headers.update(self.headers)
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=MAX_CONCURRENT_REQUESTS,
+            pool_maxsize=MAX_CONCURRENT_REQUESTS,
+            # Covers GETs only - urllib3 never retries POSTs by default (see post_with_retry)
+            max_retries=CappedRetry(
+                total=5,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504],
+                respect_retry_after_header=True
+            )
+        ))
+        
+        # Endpoint URLs are built once rather than per request
+        base_url = f"https://{self.instance}.service-now.com/api/now"
+        self.table_urls = {
+            table: f"{base_url}/table/{table}"
+            for table in (self.alert_table, self.sensor_table, self.sensor_type_table)
+        }
+        self.batch_url = f"{base_url}/v1/batch"
+        self.batch_api_available = True
+        
         # Cache for sensor types
         self.sensor_types = {}
         
+        # Case-insensitive type_name index over sensor_types, and the dict it was built from
+        self.sensor_types_by_lower = {}
+        self.sensor_types_indexed = None
+        
+        # Digest of each sheet's payloads at its last clean sync
+        self.synced_sheets = {}
+        
+        # Existing-record index per table, with the date range it covers
+        # (None = whole table), shared by every sheet in the run
+        self.existing_records = {}
+        
     def get_sensor_types(self) -> Dict[str, Dict]:
         """Fetch sensor types from ServiceNow"""
         print(f"Fetching sensor types from {self.sensor_type_table}...")
         
-        base_url = f"https://{self.instance}.service-now.com/api/now/table/{self.sensor_type_table}"
+        base_url = self.table_urls[self.sensor_type_table]
         
         try:
-            response = requests.get(
+            response = self.session.get(
                 base_url,
-                auth=(self.username, self.password),
-                headers=self.headers,
                 params={'sysparm_limit': 1000},
                 timeout=30
             )
             response.raise_for_status()
             
             sensor_types = {}
-            for record in response.json().get('result', []):
+            for record in json_loads(response.content).get('result', []):
                 # Use sys_id as the reference value (this is what ServiceNow needs)
                 sys_id = record.get('sys_id', '')
                 sensor_type_id = record.get('sensor_type_id', '')
@@ -81,23 +269,98 @@ class ServiceNowSync:
             print(f"Loaded {len(sensor_types)} sensor types")
             return sensor_types
             
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             print(f"⚠ Error fetching sensor types: {e}")
             print(f"⚠ Continuing without sensor type mapping")
             return {}
         
-    def read_all_sheets(self, file_path: str) -> Dict[str, pd.DataFrame]:
-        """Read all sheets from Excel file"""
-        print(f"Reading all sheets from Excel file: {file_path}")
+    def iter_sheets(self, file_path: str) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """
+        Yield (sheet_name, DataFrame) one sheet at a time
         
-        # Read all sheets into a dictionary
-        all_sheets = pd.read_excel(file_path, sheet_name=None, engine='openpyxl')
+        Uses the Rust calamine reader when python-calamine is installed,
+        otherwise streams the workbook with openpyxl. Each sheet is parsed
+        only when the caller asks for it, so it can be synced before the
+        next one is read.
+        """
+        print(f"Reading sheets from Excel file: {file_path}")
         
-        print(f"Found {len(all_sheets)} sheets:")
-        for sheet_name in all_sheets.keys():
-            print(f"  - {sheet_name}: {len(all_sheets[sheet_name])} rows")
+        if CALAMINE_AVAILABLE:
+            yield from self.iter_sheets_calamine(file_path)
+        else:
+            yield from self.iter_sheets_openpyxl(file_path)
+    
+    def iter_sheets_calamine(self, file_path: str) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """
+        Read sheets with calamine
+        
+        Large workbooks are parsed one sheet per process, since parsing is
+        CPU-bound and sheets are independent; sheets are still yielded in
+        workbook order as they finish. Small workbooks (the hourly master
+        log) are cheaper to read in-process than to fan out.
+        """
+        workers = min(os.cpu_count() or 1, MAX_PARSE_WORKERS)
+        if workers < 2 or os.path.getsize(file_path) < PARALLEL_PARSE_MIN_BYTES:
+            with pd.ExcelFile(file_path, engine='calamine') as workbook:
+                for sheet_name in workbook.sheet_names:
+                    yield sheet_name, workbook.parse(sheet_name, usecols=SHEET_COLUMNS.__contains__)
+            return
+        
+        sheet_names = CalamineWorkbook.from_path(file_path).sheet_names
+        with ProcessPoolExecutor(max_workers=min(workers, len(sheet_names))) as executor:
+            futures = [
+                (sheet_name, executor.submit(load_sheet, file_path, sheet_name))
+                for sheet_name in sheet_names
+            ]
+            for sheet_name, future in futures:
+                yield sheet_name, future.result()
+    
+    def iter_sheets_openpyxl(self, file_path: str) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """
+        Fallback reader when python-calamine is not installed
+        
+        Streams plain cell values with openpyxl in read-only mode (no styles,
+        cached formula values only) instead of building Cell objects, then
+        lets pandas' TextParser apply the same header/NaN/type handling
+        read_excel would.
+        """
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True, keep_links=False)
+        try:
+            for worksheet in workbook.worksheets:
+                # Empty cells become '' (as in read_excel) so TextParser reads them as NaN
+                rows = [
+                    ['' if value is None else value for value in row]
+                    for row in worksheet.iter_rows(values_only=True)
+                ]
+                
+                # read_excel ignores trailing empty rows
+                while rows and all(value == '' for value in rows[-1]):
+                    rows.pop()
+                
+                if rows:
+                    yield worksheet.title, TextParser(rows, header=0, usecols=SHEET_COLUMNS.__contains__).read()
+                else:
+                    yield worksheet.title, pd.DataFrame()
+        finally:
+            workbook.close()
+    
+    def timestamp_hours(self, timestamps: pd.Series) -> np.ndarray:
+        """
+        Hour of each Timestamp cell as floats (NaN where unparseable)
         
-        return all_sheets
+        The workbook writes 'HH:MM:SS' text, which pandas can't infer a format
+        for, so a bare to_datetime falls back to dateutil per value. Try that
+        layout in C first (it also reads datetime.time cells); if anything
+        doesn't fit, parse the column the general way so odd cells like
+        '18:00' are still read as before, keeping the fixed-layout hour only
+        where the general parse gives up.
+        """
+        hours = pd.to_datetime(timestamps, format=TIMESTAMP_FORMAT, errors='coerce').dt.hour.to_numpy(dtype=float)
+        unparsed = np.isnan(hours) & timestamps.notna().to_numpy()
+        if unparsed.any():
+            general = pd.to_datetime(timestamps, errors='coerce').dt.hour.to_numpy(dtype=float)
+            hours = np.where(np.isnan(general), hours, general)
+        return hours
     
     def filter_sensor_data_by_hour(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -115,48 +378,45 @@ class ServiceNowSync:
             print(f"⚠ Warning: 'Timestamp' column not found. Using all data.")
             return df
         
-        # Convert Timestamp to datetime and extract hour
-        df['_timestamp'] = pd.to_datetime(df['Timestamp'], errors='coerce')
-        df = df.dropna(subset=['_timestamp'])
+        # Work on the hour array alone and slice out just the selected rows,
+        # rather than adding helper columns to (and copying) the whole sheet
+        hours = self.timestamp_hours(df['Timestamp'])
         
-        if df.empty:
+        if np.isnan(hours).all():
             print("⚠ No valid timestamp values found")
-            return df
-        
-        # Extract hour from timestamp
-        df['_hour'] = df['_timestamp'].dt.hour
-        
-        # Find FIRST row with time at 12pm (hour = 12)
-        rows_12pm = df[df['_hour'] == 12]
+            return df.iloc[:0]
         
-        # Find FIRST row with time at 8pm (hour = 20)
-        rows_8pm = df[df['_hour'] == 20]
-        
-        filtered_records = []
-        
-        if not rows_12pm.empty:
-            first_12pm = rows_12pm.iloc[0]
-            filtered_records.append(first_12pm)
-            print(f"  ✓ Selected FIRST 12pm row: Excel row {rows_12pm.index[0] + 2}, Time: {first_12pm['Timestamp']}")
-        else:
-            print(f"  ⚠ No rows found with time at 12pm")
+        # FIRST row at 12pm (hour = 12) and FIRST row at 8pm (hour = 20):
+        # argmax on each boolean mask stops at the first hit
+        positions = []
+        for hour, label in ((12, '12pm'), (20, '8pm')):
+            matches = hours == hour
+            if matches.any():
+                position = int(matches.argmax())
+                positions.append(position)
+                print(f"  ✓ Selected FIRST {label} row: Excel row {df.index[position] + 2}, Time: {df['Timestamp'].iloc[position]}")
+            else:
+                print(f"  ⚠ No rows found with time at {label}")
         
-        if not rows_8pm.empty:
-            first_8pm = rows_8pm.iloc[0]
-            filtered_records.append(first_8pm)
-            print(f"  ✓ Selected FIRST 8pm row: Excel row {rows_8pm.index[0] + 2}, Time: {first_8pm['Timestamp']}")
-        else:
-            print(f"  ⚠ No rows found with time at 8pm")
-        
-        # Create dataframe from filtered records
-        if filtered_records:
-            result_df = pd.DataFrame(filtered_records)
-            result_df = result_df.drop(['_timestamp', '_hour'], axis=1, errors='ignore')
-            print(f"✓ Filtered to {len(result_df)} row(s)")
-            return result_df
-        else:
+        if not positions:
             print("⚠ No records found with time at 12pm or 8pm")
             return pd.DataFrame()
+        
+        result_df = df.iloc[positions]
+        print(f"✓ Filtered to {len(result_df)} row(s)")
+        return result_df
+    
+    def find_sensor_type(self, type_name_lower: str) -> Optional[Dict]:
+        """
+        Look up a sensor type by lower-cased type_name (first match wins)
+        The index is rebuilt whenever sensor_types is replaced
+        """
+        if self.sensor_types_indexed is not self.sensor_types:
+            self.sensor_types_by_lower = {}
+            for type_name, sensor_info in self.sensor_types.items():
+                self.sensor_types_by_lower.setdefault(type_name.lower(), sensor_info)
+            self.sensor_types_indexed = self.sensor_types
+        return self.sensor_types_by_lower.get(type_name_lower)
     
     def get_sensor_type_id_for_sheet(self, sheet_name: str) -> str:
         """
@@ -174,34 +434,50 @@ class ServiceNowSync:
         
         # Special case: Check if sheet name contains "mmwave" (case-insensitive)
         if 'mmwave' in sheet_name_lower:
-            # Find the mmWave sensor type
-            for type_name, sensor_info in self.sensor_types.items():
-                if type_name.lower() == 'mmwave':
-                    sys_id = sensor_info['sys_id']
-                    print(f"  Matched sheet '{sheet_name}' (contains 'mmwave') → Sensor: {sensor_info['sensor_type_id']} ({sensor_info['type_name']}) - sys_id: {sys_id}")
-                    return sys_id
+            sensor_info = self.find_sensor_type('mmwave')
+            if sensor_info:
+                sys_id = sensor_info['sys_id']
+                print(f"  Matched sheet '{sheet_name}' (contains 'mmwave') → Sensor: {sensor_info['sensor_type_id']} ({sensor_info['type_name']}) - sys_id: {sys_id}")
+                return sys_id
             # If mmWave sensor type not found in table, log warning
             print(f"  ⚠ mmWave sensor not found in sensor_type table for sheet '{sheet_name}'")
             return ''
         
-        # Check if sheet name matches any sensor type_name exactly
-        if sheet_name_normalized in self.sensor_types:
-            sensor_info = self.sensor_types[sheet_name_normalized]
+        # Exact type_name match first, then case-insensitive
+        sensor_info = self.sensor_types.get(sheet_name_normalized) or self.find_sensor_type(sheet_name_lower)
+        if sensor_info:
             sys_id = sensor_info['sys_id']
             print(f"  Matched sheet '{sheet_name}' → Sensor: {sensor_info['sensor_type_id']} ({sensor_info['type_name']}) - sys_id: {sys_id}")
             return sys_id
         
-        # If no exact match, try case-insensitive matching
-        for type_name, sensor_info in self.sensor_types.items():
-            if type_name.lower() == sheet_name_lower:
-                sys_id = sensor_info['sys_id']
-                print(f"  Matched sheet '{sheet_name}' → Sensor: {sensor_info['sensor_type_id']} ({sensor_info['type_name']}) - sys_id: {sys_id}")
-                return sys_id
-        
         # No match found
         print(f"  ⚠ No sensor type found for sheet '{sheet_name}'")
         return ''
     
+    def stringify_columns(self, df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+        """
+        Project df onto columns as strings in one pass
+        Missing columns, NaN/NaT cells and literal 'nan'/'NaT' text all become ''
+        """
+        projected = df.reindex(columns=columns)
+        projected = projected.astype(object).where(projected.notna(), '').astype(str)
+        return projected.mask(projected.isin(['nan', 'NaT']), '')
+    
+    def to_records(self, payloads: pd.DataFrame) -> List[Dict]:
+        """
+        Convert stringified payloads to record dicts without their empty fields
+        Only columns that actually hold a blank are checked, and blanks are
+        popped in place rather than rebuilding every row's dict
+        """
+        records = payloads.to_dict(orient='records')
+        nullable = [column for column in payloads.columns if (payloads[column] == '').any()]
+        if nullable:
+            for record in records:
+                for column in nullable:
+                    if not record[column]:
+                        del record[column]
+        return records
+    
     def transform_alert_data(self, df: pd.DataFrame, sheet_name: str) -> List[Dict]:
         """
         Transform ALERTS sheet data for iot_alert_event table
@@ -218,8 +494,6 @@ class ServiceNowSync:
         - severity
         - message
         """
-        records = []
-        
         print(f"Alert sheet columns: {list(df.columns)}")
         
         # Find the ALERT MONITOR SENSOR sys_id
@@ -271,33 +545,16 @@ class ServiceNowSync:
             print(f"⚠ Alerts will be skipped")
             return []
         
-        # Process all alert rows using the ALERT MONITOR SENSOR
-        for idx, row in df.iterrows():
-            # Extract data
-            alert_date = str(row.get('Date', ''))
-            timestamp = str(row.get('Timestamp', ''))
-            location = str(row.get('Location', ''))
-            severity = str(row.get('Value', ''))
-            message = str(row.get('Status', ''))
-            
-            # ALL alerts use the ALERT MONITOR SENSOR
-            sensor_type_sys_id = alert_monitor_sys_id
-            
-            # Map the data
-            record = {
-                'sensor_type_id': sensor_type_sys_id,  # Use ALERT MONITOR SENSOR sys_id
-                'alert_date': alert_date,
-                'alert_time': timestamp,
-                'location': location,
-                'severity': severity,
-                'message': message,
-            }
-            
-            # Filter out empty values
-            record = {k: v for k, v in record.items() if v and v != 'nan' and v != 'NaT'}
-            
-            if record and len(record) > 2:
-                records.append(record)
+        # Build every payload in one vectorized pass, renamed to the ServiceNow fields
+        payloads = self.stringify_columns(df, list(ALERT_FIELD_MAP)).rename(columns=ALERT_FIELD_MAP)
+        
+        # ALL alerts use the ALERT MONITOR SENSOR
+        payloads.insert(0, 'sensor_type_id', alert_monitor_sys_id)
+        
+        # Keep rows with at least two populated fields besides sensor_type_id
+        payloads = payloads[(payloads != '').sum(axis=1) > 2]
+        
+        records = self.to_records(payloads)
         
         print(f"Transformed {len(records)} alert records from sheet '{sheet_name}' using ALERT MONITOR SENSOR")
         return records
@@ -315,63 +572,53 @@ class ServiceNowSync:
         - status
         - is_active
         """
-        records = []
-        
         # Get the correct sensor_type_id for this sheet
         sensor_type_id = self.get_sensor_type_id_for_sheet(sheet_name)
         
-        for idx, row in df.iterrows():
-            # Extract data
-            record_date = str(row.get('Date', ''))
-            timestamp = str(row.get('Timestamp', ''))
-            
-            # Get value and determine if it's numeric or text
-            value = row.get('Value', '')
-            numeric_value = ''
-            text_value = ''
-            
-            # Convert value to string for checking
-            value_str = str(value).strip()
-            
-            # Skip if value is NaN, NaT, empty, or looks like a date/time
-            if value_str in ['nan', 'NaT', '', 'None']:
-                text_value = ''
-            # Check if it's a timestamp/date format (contains colons or dashes in date pattern)
-            elif ':' in value_str or (len(value_str) >= 8 and value_str.count('-') >= 2):
-                # This looks like a time or date, treat as text
-                text_value = value_str
-            else:
-                # Try to parse as numeric (handles integers, floats, percentages, degrees)
-                try:
-                    # Clean the value - remove common non-numeric suffixes
-                    clean_value = value_str.replace('%', '').replace('°C', '').replace('°F', '').replace('°', '').strip()
-                    numeric_val = float(clean_value)
-                    numeric_value = str(numeric_val)
-                except (ValueError, TypeError, AttributeError):
-                    # Not numeric, use as text
-                    text_value = value_str
-            
-            # Map the data
-            record = {
-                'sensor_type_id': sensor_type_id,
-                'record_date': record_date,
-                'record_time': timestamp,
-                'location': str(row.get('Location', '')),
-                'status': str(row.get('Status', '')),
-                'is_active': 'false',
-            }
-            
-            # Add numeric or text value (prefer numeric if both are set)
-            if numeric_value and numeric_value != 'nan':
-                record['numeric_value'] = numeric_value
-            elif text_value and text_value != 'nan':
-                record['text_value'] = text_value
-            
-            # Filter out empty values
-            record = {k: v for k, v in record.items() if v and v != 'nan' and v != 'NaT'}
-            
-            if record and len(record) > 2:
-                records.append(record)
+        # Build every payload in one vectorized pass, renamed to the ServiceNow fields
+        payloads = self.stringify_columns(df, [*SENSOR_FIELD_MAP, 'Value'])
+        value_str = payloads.pop('Value').str.strip()
+        payloads = payloads.rename(columns=SENSOR_FIELD_MAP)
+        payloads.insert(0, 'sensor_type_id', sensor_type_id)
+        payloads['is_active'] = 'false'
+        
+        # Decide numeric vs text per value:
+        # - NaN, NaT, empty -> no value
+        # - looks like a time or date (colons, or dashes in a date pattern) -> text
+        # - parses as a number once %, °C, °F, ° are stripped -> numeric
+        # - anything else -> text
+        is_blank = value_str.isin(['nan', 'NaT', '', 'None'])
+        looks_temporal = value_str.str.contains(':', regex=False) | (
+            (value_str.str.len() >= 8) & (value_str.str.count('-') >= 2)
+        )
+        clean_value = (
+            value_str.str.replace('%', '', regex=False)
+            .str.replace('°C', '', regex=False)
+            .str.replace('°F', '', regex=False)
+            .str.replace('°', '', regex=False)
+            .str.strip()
+        )
+        # Numbers are parsed and formatted with float()/str() per value, as
+        # pd.to_numeric rounds differently and rejects some spellings float()
+        # accepts ('1_000', non-ASCII digits) - these strings are part of the
+        # duplicate key. Sensor sheets are down to two rows here.
+        candidates = ~is_blank & ~looks_temporal
+        numeric_text = pd.Series(
+            [float_text(value) if candidate else None for value, candidate in zip(clean_value, candidates)],
+            index=value_str.index, dtype=object
+        )
+        is_number = numeric_text.notna()
+        
+        # A literal "nan" parses as a number but carries no value
+        is_numeric = is_number & (numeric_text != 'nan')
+        is_text = looks_temporal | (candidates & ~is_number)
+        payloads['numeric_value'] = numeric_text.where(is_numeric, '')
+        payloads['text_value'] = value_str.where(is_text, '')
+        
+        # Keep rows with at least two populated fields besides sensor_type_id
+        payloads = payloads[(payloads != '').sum(axis=1) > 2]
+        
+        records = self.to_records(payloads)
         
         print(f"Transformed {len(records)} sensor records from sheet '{sheet_name}'")
         return records
@@ -381,111 +628,307 @@ class ServiceNowSync:
         if value is None or value == '':
             return ''
         
-        value_str = str(value).strip()
+        return normalize_text(str(value))
+    
+    def get_key_fields(self, table: str) -> tuple:
+        """Fields that make up the duplicate-check key for a table (date first)"""
+        return ALERT_KEY_FIELDS if table == self.alert_table else SENSOR_KEY_FIELDS
+    
+    def get_identifier(self, table: str) -> Callable[[Dict], tuple]:
+        """
+        Build the duplicate-check key function for a table
+        Existing and incoming records must be keyed by the same function
+        """
+        key_fields = self.get_key_fields(table)
+        normalize_value = self.normalize_value
         
-        # Normalize common variations
-        if value_str.lower() in ['nan', 'nat', 'none', 'null']:
-            return ''
+        def identifier(record: Dict) -> tuple:
+            return tuple([normalize_value(record.get(field, '')) for field in key_fields])
         
-        # For time values, normalize to remove microseconds and timezone info
-        # e.g., "20:57:45.000" -> "20:57:45"
-        if ':' in value_str and len(value_str) > 5:
-            # Remove microseconds if present
-            if '.' in value_str:
-                value_str = value_str.split('.')[0]
-            # Remove timezone info if present
-            if '+' in value_str:
-                value_str = value_str.split('+')[0].strip()
-            if value_str.endswith('Z'):
-                value_str = value_str[:-1].strip()
+        return identifier
+    
+    def get_date_range(self, dates: Optional[List[str]]) -> Optional[Tuple[str, str]]:
+        """
+        (first, last) ISO date of the incoming records, for scoping the fetch
+        
+        Only ISO dates are trusted: a string min/max of other layouts
+        ('6/2/2026' vs '10/2/2026') is wrong and guessing day/month order is
+        no better, so if any date doesn't parse the whole table is fetched
+        (None) rather than risk missing existing rows and creating duplicates.
+        """
+        if not dates:
+            return None
+        
+        parsed = pd.to_datetime(pd.Series(dates, dtype=object), format='ISO8601', errors='coerce')
+        if parsed.isna().any():
+            print("⚠ Unrecognized record dates - checking duplicates against the whole table")
+            return None
+        return parsed.min().strftime('%Y-%m-%d'), parsed.max().strftime('%Y-%m-%d')
+    
+    def range_covers(self, outer: Optional[Tuple[str, str]], inner: Optional[Tuple[str, str]]) -> bool:
+        """Whether date range outer contains inner (None = whole table)"""
+        if outer is None:
+            return True
+        return inner is not None and outer[0] <= inner[0] and inner[1] <= outer[1]
+    
+    def get_existing_records(self, table: str, dates: Optional[List[str]] = None) -> Dict[Tuple[str, ...], str]:
+        """
+        Fetch existing records from ServiceNow to check for duplicates
+        
+        Only the key fields are requested, paged EXISTING_PAGE_SIZE at a time.
+        When dates are given, the query is scoped to that date range so we
+        don't pull the whole table. The result is cached per table, so later
+        sheets whose dates fall inside an already-fetched range reuse it,
+        and persisted on disk so the next run only fetches rows created or
+        updated since.
+        """
+        date_range = self.get_date_range(dates)
+        
+        cached = self.existing_records.get(table)
+        if cached:
+            cached_range, existing = cached
+            if self.range_covers(cached_range, date_range):
+                print(f"Using {len(existing)} cached existing records for {table}")
+                return existing
+            if date_range is not None:
+                # Widen to cover both so the cache stays a superset
+                date_range = (min(date_range[0], cached_range[0]), max(date_range[1], cached_range[1]))
+        
+        disk_cache = self.load_existing_cache(table, date_range)
         
-        # Normalize numeric values to consistent format
         try:
-            # If it's a number, normalize it
-            num = float(value_str)
-            # Remove trailing zeros and decimal point if integer
-            if num == int(num):
-                return str(int(num))
+            if disk_cache:
+                date_range = disk_cache['date_range']
+                existing = {tuple(key): sys_id for key, sys_id in disk_cache['records']}
+                since = disk_cache['last_updated']
+                print(f"Loaded {len(existing)} existing records for {table} from {self.cache_path(table)}")
+                print(f"Fetching records changed in {table} since {since}...")
+                changed, last_updated = self.fetch_existing_records(table, date_range, since)
+                
+                # An edited record must drop the key it was cached under
+                changed_ids = set(changed.values())
+                existing = {key: sys_id for key, sys_id in existing.items() if sys_id not in changed_ids}
+                existing.update(changed)
+                last_updated = max(last_updated, since)
+                fetched_at = disk_cache['fetched_at']
             else:
-                return str(num)
-        except (ValueError, TypeError):
-            pass
+                print(f"Fetching existing records from {table}...")
+                fetched_at = time.time()
+                existing, last_updated = self.fetch_existing_records(table, date_range)
+                # Empty range - the next run only needs rows changed after now
+                last_updated = last_updated or time.strftime(SYS_TIME_FORMAT, time.gmtime(fetched_at))
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"⚠ Error fetching existing records from {table}: {e}")
+            print(f"⚠ Continuing without duplicate check - all records will be created")
+            return {}
         
-        return value_str
+        print(f"Found {len(existing)} existing records in {table}")
+        self.existing_records[table] = (date_range, existing)
+        self.write_cache(table, {
+            'fetched_at': fetched_at,
+            'last_updated': last_updated,
+            'date_range': date_range,
+            # JSON has no tuple keys - store [key fields, sys_id] pairs
+            'records': [[list(key), sys_id] for key, sys_id in existing.items()]
+        })
+        return existing
     
-    def get_existing_records(self, table: str) -> Dict[str, str]:
-        """Fetch existing records from ServiceNow to check for duplicates"""
-        print(f"Fetching existing records from {table}...")
+    def fetch_existing_records(self, table: str, date_range: Optional[Tuple[str, str]],
+                               since: Optional[str] = None) -> Tuple[Dict[Tuple[str, ...], str], str]:
+        """
+        Page through a table's duplicate-check keys
         
-        base_url = f"https://{self.instance}.service-now.com/api/now/table/{table}"
+        Returns the {key tuple: sys_id} index and the newest sys_updated_on
+        seen. With since (a SYS_TIME_FORMAT timestamp), only rows created or
+        updated after it are fetched. Raises RequestException when a request
+        fails and ValueError when a response body isn't valid JSON.
+        """
+        base_url = self.table_urls[table]
         
-        try:
-            response = requests.get(
+        key_fields = self.get_key_fields(table)
+        date_field = key_fields[0]
+        
+        conditions = []
+        if date_range:
+            conditions += [f"{date_field}>={date_range[0]}", f"{date_field}<={date_range[1]}"]
+        if since:
+            # Step back a day so instance timezone and in-flight inserts can't hide rows
+            overlap = datetime.strptime(since, SYS_TIME_FORMAT) - timedelta(days=1)
+            conditions.append(f"sys_updated_on>={overlap.strftime(SYS_TIME_FORMAT)}")
+        # Stable ordering so pages don't shift under us
+        conditions.append('ORDERBYsys_id')
+        
+        params = {
+            'sysparm_query': '^'.join(conditions),
+            'sysparm_fields': ','.join(('sys_id', 'sys_updated_on') + key_fields),
+            # Return reference fields (sensor_type_id) as plain sys_id strings
+            'sysparm_exclude_reference_link': 'true',
+            'sysparm_limit': EXISTING_PAGE_SIZE
+        }
+        
+        identifier = self.get_identifier(table)
+        existing = {}
+        last_updated = ''
+        offset = 0
+        while True:
+            response = self.session.get(
                 base_url,
-                auth=(self.username, self.password),
-                headers=self.headers,
-                params={'sysparm_limit': 10000},
+                params={**params, 'sysparm_offset': offset},
                 timeout=30
             )
             response.raise_for_status()
+            page = json_loads(response.content).get('result', [])
             
-            existing = {}
-            for record in response.json().get('result', []):
-                # Create unique key from ALL relevant fields to detect exact duplicates
-                if table == self.alert_table:
-                    date = self.normalize_value(record.get('alert_date', ''))
-                    time_val = self.normalize_value(record.get('alert_time', ''))
-                    location = self.normalize_value(record.get('location', ''))
-                    severity = self.normalize_value(record.get('severity', ''))
-                    message = self.normalize_value(record.get('message', ''))
-                    sensor_id = self.normalize_value(record.get('sensor_type_id', ''))
-                    key = f"{date}|{time_val}|{location}|{severity}|{message}|{sensor_id}"
-                else:
-                    # For sensor records, include ALL fields in key to detect exact duplicates
-                    date = self.normalize_value(record.get('record_date', ''))
-                    time_val = self.normalize_value(record.get('record_time', ''))
-                    location = self.normalize_value(record.get('location', ''))
-                    sensor_id = self.normalize_value(record.get('sensor_type_id', ''))
-                    status = self.normalize_value(record.get('status', ''))
-                    numeric_val = self.normalize_value(record.get('numeric_value', ''))
-                    text_val = self.normalize_value(record.get('text_value', ''))
-                    is_active = self.normalize_value(record.get('is_active', ''))
-                    # Create comprehensive key with ALL columns
-                    key = f"{date}|{time_val}|{location}|{sensor_id}|{status}|{numeric_val}|{text_val}|{is_active}"
-                
-                if key:
-                    existing[key] = record['sys_id']
+            # Key each record on ALL relevant fields to detect exact duplicates
+            existing.update({identifier(record): record['sys_id'] for record in page})
+            last_updated = max([last_updated] + [record.get('sys_updated_on') or '' for record in page])
             
-            print(f"Found {len(existing)} existing records in {table}")
-            return existing
+            if len(page) < EXISTING_PAGE_SIZE:
+                break
+            offset += EXISTING_PAGE_SIZE
+        
+        return existing, last_updated
+    
+    def cache_path(self, name: str) -> str:
+        """On-disk location of one of this instance's cache files"""
+        return os.path.join(CACHE_DIR, f"{self.instance}_{name}.json")
+    
+    def read_cache(self, name: str) -> Optional[Dict]:
+        """Load a cache file saved by a previous run (None if missing, unreadable or not an object)"""
+        try:
+            with open(self.cache_path(name), 'rb') as f:
+                cache = json_loads(f.read())
+        except (OSError, ValueError):
+            return None
+        return cache if isinstance(cache, dict) else None
+    
+    def write_cache(self, name: str, data: Dict):
+        """Persist a cache file for the next run"""
+        path = self.cache_path(name)
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(f"{path}.tmp", 'wb') as f:
+                f.write(json_dumps(data))
+            os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            print(f"⚠ Could not save cache {path}: {e}")
+    
+    def load_sheets_cache(self) -> Dict[str, Dict]:
+        """
+        Load the synced-sheet digests saved by a previous run
+        
+        Entries without a string digest and a numeric synced_at are dropped,
+        so a damaged file only costs those sheets a normal sync.
+        """
+        return {
+            sheet_name: entry
+            for sheet_name, entry in (self.read_cache('sheets') or {}).items()
+            if isinstance(entry, dict)
+            and isinstance(entry.get('digest'), str)
+            and isinstance(entry.get('synced_at'), (int, float))
+            and not isinstance(entry.get('synced_at'), bool)
+        }
+    
+    def load_existing_cache(self, table: str, date_range: Optional[Tuple[str, str]]) -> Optional[Dict]:
+        """
+        Load a table's index saved by a previous run
+        
+        Returns None when there is no usable cache: missing, unreadable,
+        without a valid last_updated, older than CACHE_TTL (so rows deleted
+        in ServiceNow are eventually forgotten) or not covering the
+        requested dates.
+        """
+        cache = self.read_cache(table)
+        if not cache or not isinstance(cache.get('records'), list):
+            return None
+        try:
+            datetime.strptime(cache.get('last_updated'), SYS_TIME_FORMAT)
+        except (TypeError, ValueError):
+            # Can't resume from it - a full fetch rewrites the cache
+            return None
+        if time.time() - cache.get('fetched_at', 0) > CACHE_TTL:
+            return None
+        
+        cached_range = tuple(cache['date_range']) if cache.get('date_range') else None
+        if not self.range_covers(cached_range, date_range):
+            return None
+        
+        cache['date_range'] = cached_range
+        return cache
+    
+    def sheet_digest(self, records: List[Dict]) -> str:
+        """Fingerprint of the payloads a sheet produced"""
+        return hashlib.sha256(json_dumps(records)).hexdigest()
+    
+    def sync_sheet(self, table: str, sheet_name: str, records: List[Dict]) -> tuple:
+        """
+        Sync a sheet's records, skipping the round-trips entirely when it
+        produced exactly the same payloads as the last clean sync
+        
+        A sheet is only remembered when nothing failed, so failed rows are
+        retried on the next run; entries expire after CACHE_TTL.
+        """
+        if not records:
+            return self.sync_records(table, records)
+        
+        digest = self.sheet_digest(records)
+        synced = self.synced_sheets.get(sheet_name)
+        if synced and synced['digest'] == digest and time.time() - synced['synced_at'] <= CACHE_TTL:
+            print(f"⏭ Sheet '{sheet_name}' unchanged since last sync - skipping {len(records)} records")
+            return 0, len(records), 0
+        
+        created, skipped, failed = self.sync_records(table, records)
+        if not failed:
+            self.synced_sheets[sheet_name] = {'digest': digest, 'synced_at': time.time()}
+        return created, skipped, failed
+    
+    def describe_record(self, table: str, data: Dict) -> str:
+        """Short human-readable identifier for log lines"""
+        location = data.get('location', 'Unknown')
+        sensor_id = data.get('sensor_type_id', 'Unknown')
+        if table == self.alert_table:
+            return f"{data.get('alert_date')} {data.get('alert_time')} - {location} - {sensor_id}"
+        return f"{data.get('record_date')} {data.get('record_time')} - {location} - {sensor_id}"
+    
+    def retry_delay(self, response: requests.Response, attempt: int) -> float:
+        """Seconds to wait before re-sending a throttled POST"""
+        # Never let the server park a worker for longer than our own cap
+        retry_after = response.headers.get('Retry-After', '')
+        if retry_after.isdigit():
+            return min(POST_BACKOFF_CAP, float(retry_after))
+        
+        # ServiceNow rate-limit rules report when the window resets (epoch seconds)
+        reset = response.headers.get('X-RateLimit-Reset', '')
+        if reset.isdigit():
+            return min(POST_BACKOFF_CAP, max(0.0, int(reset) - time.time()))
+        
+        return min(POST_BACKOFF_CAP, POST_BACKOFF_BASE * 2 ** attempt) + random.uniform(0, POST_BACKOFF_BASE)
+    
+    def post_with_retry(self, url: str, body: bytes, timeout: int) -> requests.Response:
+        """
+        POST a JSON body, backing off and re-sending on 429/503
+        
+        Other failures are returned as-is: the request may already have been
+        applied, and re-sending it would create duplicates.
+        """
+        for attempt in range(POST_MAX_RETRIES + 1):
+            response = self.session.post(url, data=body, timeout=timeout)
+            if response.status_code not in RETRYABLE_POST_STATUSES or attempt == POST_MAX_RETRIES:
+                return response
             
-        except requests.exceptions.RequestException as e:
-            print(f"⚠ Error fetching existing records from {table}: {e}")
-            print(f"⚠ Continuing without duplicate check - all records will be created")
-            return {}
+            delay = self.retry_delay(response, attempt)
+            print(f"⚠ ServiceNow returned {response.status_code}, retrying in {delay:.1f}s ({attempt + 1}/{POST_MAX_RETRIES})")
+            time.sleep(delay)
     
     def create_record(self, table: str, data: Dict) -> bool:
         """Create a new record in ServiceNow"""
-        base_url = f"https://{self.instance}.service-now.com/api/now/table/{table}"
+        base_url = self.table_urls[table]
         
         try:
-            response = requests.post(
-                base_url,
-                auth=(self.username, self.password),
-                headers=self.headers,
-                json=data,
-                timeout=30
-            )
+            response = self.post_with_retry(f"{base_url}?{CREATE_QUERY}", json_dumps(data), timeout=30)
             response.raise_for_status()
             
-            location = data.get('location', 'Unknown')
-            sensor_id = data.get('sensor_type_id', 'Unknown')
-            if table == self.alert_table:
-                identifier = f"{data.get('alert_date')} {data.get('alert_time')} - {location} - {sensor_id}"
-            else:
-                identifier = f"{data.get('record_date')} {data.get('record_time')} - {location} - {sensor_id}"
-            
-            print(f"✓ Created record in {table}: {identifier}")
+            print(f"✓ Created record in {table}: {self.describe_record(table, data)}")
             return True
             
         except requests.exceptions.RequestException as e:
@@ -494,61 +937,149 @@ class ServiceNowSync:
                 print(f"  Response: {e.response.text[:500]}")  # First 500 chars
             return False
     
+    def create_records_batch(self, table: str, records: List[Dict]) -> List[Optional[bool]]:
+        """
+        Create up to BATCH_SIZE records with a single POST to the ServiceNow Batch API
+        
+        Returns one entry per record: True (created), False (failed) or
+        None (not serviced by the batch - safe to retry with a single POST)
+        """
+        if not self.batch_api_available:
+            return [None] * len(records)
+        
+        payload = {
+            'batch_request_id': str(uuid.uuid4()),
+            'rest_requests': [
+                {
+                    'id': str(i),
+                    'method': 'POST',
+                    'url': f"/api/now/table/{table}?{CREATE_QUERY}",
+                    'headers': [
+                        {'name': 'Content-Type', 'value': 'application/json'},
+                        {'name': 'Accept', 'value': 'application/json'}
+                    ],
+                    'body': base64.b64encode(json_dumps(record)).decode()
+                }
+                for i, record in enumerate(records)
+            ]
+        }
+        
+        try:
+            response = self.post_with_retry(self.batch_url, json_dumps(payload), timeout=120)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            status = getattr(e.response, 'status_code', None)
+            if status in BATCH_UNAVAILABLE_STATUSES:
+                # Endpoint missing or not permitted for this user - stop trying it
+                print(f"⚠ Batch API unavailable ({status}), falling back to one POST per record")
+                self.batch_api_available = False
+                return [None] * len(records)
+            # Throttled past the retries, rejected or possibly partially
+            # applied - fail this batch only and don't re-send it
+            print(f"✗ Error creating {len(records)} records in {table} via Batch API: {e}")
+            return [False] * len(records)
+        
+        try:
+            serviced = {sub.get('id'): sub for sub in json_loads(response.content).get('serviced_requests', [])}
+        except ValueError as e:
+            print(f"✗ Unreadable Batch API response for {len(records)} records in {table}: {e}")
+            return [False] * len(records)
+        
+        results = []
+        for i, record in enumerate(records):
+            sub = serviced.get(str(i))
+            if sub is None:
+                results.append(None)
+            elif 200 <= int(sub.get('status_code', 0)) < 300:
+                print(f"✓ Created record in {table}: {self.describe_record(table, record)}")
+                results.append(True)
+            else:
+                print(f"✗ Error creating record in {table}: HTTP {sub.get('status_code')}")
+                try:
+                    body = base64.b64decode(sub.get('body') or '').decode(errors='replace')
+                except ValueError:
+                    body = '<undecodable response body>'
+                print(f"  Response: {body[:500]}")  # First 500 chars
+                results.append(False)
+        
+        return results
+    
+    def create_records(self, table: str, records: List[Dict]) -> List[bool]:
+        """Create records in ServiceNow, BATCH_SIZE per Batch API call, falling back to single POSTs"""
+        chunks = [records[i:i + BATCH_SIZE] for i in range(0, len(records), BATCH_SIZE)]
+        
+        # Overlap the round-trips - each call is dominated by ServiceNow latency
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+            batch_results = [
+                result
+                for chunk_results in executor.map(lambda chunk: self.create_records_batch(table, chunk), chunks)
+                for result in chunk_results
+            ]
+            
+            # Anything the Batch API did not service goes through the Table API
+            unserviced = [record for record, result in zip(records, batch_results) if result is None]
+            fallback_results = iter(list(executor.map(lambda record: self.create_record(table, record), unserviced)))
+        
+        return [next(fallback_results) if result is None else result for result in batch_results]
+    
     def sync_records(self, table: str, records: List[Dict]) -> tuple:
         """Sync records to ServiceNow (create new records only, skip duplicates)"""
         if not records:
             print(f"No records to sync to {table}")
             return 0, 0, 0
         
-        existing = self.get_existing_records(table)
+        # Resolve the key layout once per table rather than per record
+        key_fields = self.get_key_fields(table)
+        date_field = key_fields[0]
+        sensor_pos = key_fields.index('sensor_type_id')
+        get_identifier = self.get_identifier(table)
+        
+        # Only records in the incoming date range can be duplicates
+        dates = [record[date_field] for record in records if record.get(date_field)]
+        existing = self.get_existing_records(table, dates)
         
         print(f"\nDuplicate Check: Comparing {len(records)} new records against {len(existing)} existing records")
         
         created = 0
         skipped = 0
         failed = 0
+        new_records = []
+        queued = set()
         
         for record in records:
             # Create unique identifier matching ALL fields with normalization
-            if table == self.alert_table:
-                date = self.normalize_value(record.get('alert_date', ''))
-                time_val = self.normalize_value(record.get('alert_time', ''))
-                location = self.normalize_value(record.get('location', ''))
-                severity = self.normalize_value(record.get('severity', ''))
-                message = self.normalize_value(record.get('message', ''))
-                sensor_id = self.normalize_value(record.get('sensor_type_id', ''))
-                identifier = f"{date}|{time_val}|{location}|{severity}|{message}|{sensor_id}"
-            else:
-                # For sensor records, use ALL fields with normalization to detect exact duplicates
-                date = self.normalize_value(record.get('record_date', ''))
-                time_val = self.normalize_value(record.get('record_time', ''))
-                location = self.normalize_value(record.get('location', ''))
-                sensor_id = self.normalize_value(record.get('sensor_type_id', ''))
-                status = self.normalize_value(record.get('status', ''))
-                numeric_val = self.normalize_value(record.get('numeric_value', ''))
-                text_val = self.normalize_value(record.get('text_value', ''))
-                is_active = self.normalize_value(record.get('is_active', 'false'))
-                identifier = f"{date}|{time_val}|{location}|{sensor_id}|{status}|{numeric_val}|{text_val}|{is_active}"
+            identifier = get_identifier(record)
+            date, time_val, location = identifier[:3]
+            sensor_id = identifier[sensor_pos]
             
             if not date or not time_val:
                 print(f"⚠ Skipping record without date or time: {record}")
                 failed += 1
                 continue
             
-            # Debug: Print what we're checking
-            print(f"\n  Checking: {identifier[:80]}...")
-            
             if identifier in existing:
                 # Skip - already exists
                 print(f"  ⏭ DUPLICATE FOUND - Skipping: {date} {time_val} - {location} - {sensor_id}")
                 skipped += 1
+            elif identifier in queued:
+                # Same row appears more than once in this sheet - create it once
+                print(f"  ⏭ DUPLICATE IN SHEET - Skipping: {date} {time_val} - {location} - {sensor_id}")
+                skipped += 1
             else:
-                # Create new record
+                # Queue new record for creation
+                queued.add(identifier)
                 print(f"  ✓ NEW RECORD - Creating: {date} {time_val} - {location} - {sensor_id}")
-                if self.create_record(table, record):
-                    created += 1
-                else:
-                    failed += 1
+                new_records.append((identifier, record))
+        
+        if new_records:
+            results = self.create_records(table, [record for _, record in new_records])
+            created += sum(results)
+            failed += len(results) - sum(results)
+            
+            # Later sheets share the cached index - record what we just created
+            for (identifier, _), result in zip(new_records, results):
+                if result:
+                    existing[identifier] = ''
         
         print(f"\n{'=' * 80}")
         print(f"DUPLICATE CHECK RESULTS:")
@@ -559,7 +1090,19 @@ class ServiceNowSync:
         
         return created, skipped, failed
 
+def load_env():
+    """Load environment variables from .env file if it exists"""
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+        print("✓ Loaded environment variables from .env file")
+    except ImportError:
+        print("⚠ python-dotenv not installed. Using system environment variables only.")
+        print("  Install with: pip install python-dotenv")
+
 def main():
+    load_env()
+    
     print("=" * 80)
     print("Starting ServiceNow Sync Process")
     print("Configuration:")
@@ -575,6 +1118,9 @@ def main():
         # Load sensor types from ServiceNow
         sync.sensor_types = sync.get_sensor_types()
         
+        # Sheets synced cleanly by earlier runs
+        sync.synced_sheets = sync.load_sheets_cache()
+        
         # Read all sheets from Excel
         # Get excel file from command line argument or use default
         if len(sys.argv) > 1:
@@ -582,18 +1128,14 @@ def main():
         else:
             excel_file = "SeniorConnect_MasterLog.xlsx"
         
-        all_sheets = sync.read_all_sheets(excel_file)
-        
-        if not all_sheets:
-            print("⚠ No sheets found in Excel file")
-            return
-        
         total_created = 0
         total_skipped = 0
         total_failed = 0
+        sheet_count = 0
         
-        # Process each sheet
-        for sheet_name, df in all_sheets.items():
+        # Process each sheet as soon as it is parsed
+        for sheet_name, df in sync.iter_sheets(excel_file):
+            sheet_count += 1
             print(f"\n{'=' * 80}")
             print(f"Processing sheet: {sheet_name}")
             print(f"{'=' * 80}")
@@ -603,14 +1145,14 @@ def main():
                 continue
             
             # Check if this is the ALERTS sheet
-            is_alert_sheet = sheet_name.upper() == 'ALERTS'
+            is_alert_sheet = sheet_name.upper() in ALERT_SHEET_NAMES
             
             if is_alert_sheet:
                 # ALERTS: Push ALL data
                 print(f"📢 ALERTS sheet → Pushing ALL data to {sync.alert_table}")
                 print(f"Total rows in sheet: {len(df)}")
                 records = sync.transform_alert_data(df, sheet_name)
-                created, skipped, failed = sync.sync_records(sync.alert_table, records)
+                created, skipped, failed = sync.sync_sheet(sync.alert_table, sheet_name, records)
             else:
                 # OTHER SHEETS: Filter to time at 12pm and 8pm FIRST ROWS only
                 print(f"📊 Sensor sheet → Filtering for time at 12pm and 8pm FIRST rows")
@@ -621,7 +1163,7 @@ def main():
                     continue
                 
                 records = sync.transform_sensor_data(filtered_df, sheet_name)
-                created, skipped, failed = sync.sync_records(sync.sensor_table, records)
+                created, skipped, failed = sync.sync_sheet(sync.sensor_table, sheet_name, records)
             
             total_created += created
             total_skipped += skipped
@@ -629,6 +1171,12 @@ def main():
             
             print(f"Sheet '{sheet_name}' sync: {created} created, {skipped} skipped, {failed} failed")
         
+        sync.write_cache('sheets', sync.synced_sheets)
+        
+        if not sheet_count:
+            print("⚠ No sheets found in Excel file")
+            return
+        
         # Print overall summary
         print("\n" + "=" * 80)
         print("Overall Sync Summary:")